@@ -83,14 +83,12 @@ lof = [cA[:12], cB[:12],
 # add bonds and angles
 for l in lof:
 
-    rbr = IMP.pmi.restraints.stereochemistry.ResidueBondRestraint(objects=l)
+    rbr, rar, excluded = IMP.pmi.restraints.stereochemistry.\
+        get_residue_bond_and_angle_restraints(objects=l)
     rbr.add_to_model()
-    listofexcludedpairs += rbr.get_excluded_pairs()
-    log_objects.append(rbr)
-
-    rar = IMP.pmi.restraints.stereochemistry.ResidueAngleRestraint(objects=l)
     rar.add_to_model()
-    listofexcludedpairs += rar.get_excluded_pairs()
+    listofexcludedpairs += excluded
+    log_objects.append(rbr)
     log_objects.append(rar)
 
 # add excluded volume
@@ -18,6 +18,27 @@ import re
 from collections import defaultdict
 import itertools
 
+# DSSP secondary structure code -> SSE type index (0=helix, 1=beta, 2=loop),
+# indexed by the byte value of the code; anything unrecognized is a loop
+_SSE_TYPES = ('helix', 'beta', 'loop')
+_SSE_LUT = np.full(256, 2, dtype=np.int8)
+_SSE_LUT[[ord(c) for c in 'GHI']] = 0
+_SSE_LUT[[ord(c) for c in 'EB']] = 1
+
+def _segment_sses(codes, chain_break):
+    """Split a per-residue array of SSE type codes into runs.
+    An SSE starts wherever the type changes or a chain break ends,
+    and stops wherever the type changes or a chain break begins.
+    @return arrays of the first and last row index of each run
+    """
+    changed = codes[1:] != codes[:-1]
+    is_start = np.ones(len(codes), dtype=bool)
+    is_start[1:] = changed | chain_break[:-1]
+    is_end = np.ones(len(codes), dtype=bool)
+    is_end[:-1] = changed | chain_break[1:]
+    return (np.flatnonzero(is_start & ~chain_break),
+            np.flatnonzero(is_end & ~chain_break))
+
 def parse_dssp(dssp_fn, limit_to_chains='',name_map=None):
     """Read a DSSP file, and return secondary structure elements (SSEs).
     Values are all PDB residue numbering.
@@ -50,80 +71,138 @@ def parse_dssp(dssp_fn, limit_to_chains='',name_map=None):
             return name_map.get(ch, ch)
 
     # setup
-    helix_classes = 'GHI'
-    strand_classes = 'EB'
-    loop_classes = [' ', '', 'T', 'S']
-    sse_dict = {}
-    for h in helix_classes:
-        sse_dict[h] = 'helix'
-    for s in strand_classes:
-        sse_dict[s] = 'beta'
-    for l in loop_classes:
-        sse_dict[l] = 'loop'
     sses = {'helix':[],
             'beta':[],
             'loop':[]}
 
-    # read file and parse
-    start = False
+    # read the whole file as bytes and jump straight to the residue block
+    # (everything after the RESIDUE header), skipping the summary header
+    with open(dssp_fn, 'rb') as fh:
+        contents = fh.read()
+    header = contents.find(b'  #  RESIDUE')
+    if header < 0:
+        return sses
+    start = contents.find(b'\n', header) + 1
+    if start == 0:
+        return sses
+    body = [line for line in contents[start:].splitlines() if line.strip()]
+    if not body:
+        return sses
+
+    # DSSP is fixed-width, so view the block as a 2D character array
+    # and pull out each column we need in one go
+    rows = np.array(body, dtype='S')
+    if rows.dtype.itemsize < 34:
+        rows = rows.astype('S34')
+    chars = rows.view('S1').reshape(len(rows), -1)
+    chain_break = chars[:, 9] == b' '
+    chains = chars[:, 11]
+    if limit_to_chains != '':
+        keep = chain_break | np.isin(chains,
+                                     [c.encode() for c in limit_to_chains])
+        chars = chars[keep]
+        chain_break = chain_break[keep]
+        chains = chains[keep]
+    beta_ids = chars[:, 33]
+    codes = _SSE_LUT[chars[:, 16].view(np.uint8)]
+    resnums = np.zeros(len(chars), dtype=np.int32)
+    resnums[~chain_break] = np.ascontiguousarray(
+            chars[~chain_break, 5:10]).view('S5')[:, 0].astype(np.int32)
+
+    starts, ends = _segment_sses(codes, chain_break)
+
+    # build the SSE elements straight from whole-column Python lists,
+    # rather than going through NumPy scalars one segment at a time
+    seg_codes = codes[starts]
+    seg_chains = [convert_chain(ch)
+                  for ch in chains[starts].astype(str).tolist()]
+    seg_sses = [list(sse) for sse in zip(resnums[starts].tolist(),
+                                         resnums[ends].tolist(), seg_chains)]
+    for code in (0, 2):
+        indexes = np.flatnonzero(seg_codes == code).tolist()
+        sses[_SSE_TYPES[code]] = [[seg_sses[i]] for i in indexes]
+
+    # group strands into sheets by DSSP's sheet ID, keeping the sheets
+    # in order of first appearance
+    strands = np.flatnonzero(seg_codes == 1)
+    _, first, inverse = np.unique(beta_ids[ends[strands]],
+                                  return_index=True,
+                                  return_inverse=True)
+    sheets = np.split(strands[np.argsort(inverse, kind='mergesort')],
+                      np.cumsum(np.bincount(inverse))[:-1])
+    for sheet in np.argsort(first):
+        sses['beta'].append([seg_sses[i] for i in sheets[sheet].tolist()])
+    return sses
 
-    # temporary beta dictionary indexed by DSSP's ID
-    beta_dict = IMP.pmi.tools.OrderedDefaultDict(list)
-    prev_sstype = None
-    prev_beta_id = None
+class SSELookup(object):
+    """Fast lookup of the secondary structure type of residues.
+    Built from the output of parse_dssp(). The SSE elements of each chain
+    are stored as sorted NumPy arrays of start and end residues, so
+    queries are binary searches rather than scans over the SSE lists.
 
-    with open(dssp_fn, 'r') as fh:
-        for line in fh:
-            fields = line.split()
-            chain_break = False
-            if len(fields) < 2:
-                continue
-            if fields[1] == "RESIDUE":
-                # Start parsing from here
-                start = True
-                continue
-            if not start:
-                continue
-            if line[9] == " ":
-                chain_break = True
-            elif limit_to_chains != '' and line[11] not in limit_to_chains:
-                continue
+    @code{.py}
+    sses = IMP.pmi.io.parse_dssp('my.dssp')
+    lookup = IMP.pmi.io.SSELookup(sses)
+    lookup.get_sse_type('A', 42)   # e.g. 'helix'
+    lookup.get_residues_in('helix', 'A', range(1, 100))  # boolean mask
+    @endcode
+    """
 
-            # gather line info
-            if not chain_break:
-                pdb_res_num = int(line[5:10])
-                chain = line[11]
-                sstype = sse_dict[line[16]]
-                beta_id = line[33]
-
-            # decide whether to extend or store the SSE
-            if prev_sstype is None:
-                cur_sse = [pdb_res_num,pdb_res_num,convert_chain(chain)]
-            elif sstype != prev_sstype or chain_break:
-                # add cur_sse to the right place
-                if prev_sstype in ['helix', 'loop']:
-                    sses[prev_sstype].append([cur_sse])
-                else: # prev_sstype == 'beta'
-                    beta_dict[prev_beta_id].append(cur_sse)
-                cur_sse = [pdb_res_num,pdb_res_num,convert_chain(chain)]
-            else:
-                cur_sse[1] = pdb_res_num
-            if chain_break:
-                prev_sstype = None
-                prev_beta_id = None
-            else:
-                prev_sstype = sstype
-                prev_beta_id = beta_id
-
-    # final SSE processing
-    if prev_sstype in ['helix', 'loop']:
-        sses[prev_sstype].append([cur_sse])
-    elif prev_sstype == 'beta':
-        beta_dict[prev_beta_id].append(cur_sse)
-    # gather betas
-    for beta_sheet in beta_dict:
-        sses['beta'].append(beta_dict[beta_sheet])
-    return sses
+    def __init__(self, sses):
+        """Constructor.
+        @param sses The dictionary returned by parse_dssp()
+        @note If several chains were mapped to the same name (with the
+              name_map argument to parse_dssp()) their SSE elements may
+              overlap. Overlapping elements of the same type are merged;
+              overlapping elements of different types raise ValueError.
+        """
+        elements = defaultdict(list)
+        for code, sse_type in enumerate(_SSE_TYPES):
+            for sse in sses[sse_type]:
+                for start, end, chain in sse:
+                    elements[chain].append((start, end, code))
+        self._chains = {}
+        for chain, els in elements.items():
+            merged = []
+            for start, end, code in sorted(els):
+                if merged and start <= merged[-1][1]:
+                    if code != merged[-1][2]:
+                        raise ValueError(
+                            "Overlapping %s (%d-%d) and %s (%d-%d) elements "
+                            "for %s" % (_SSE_TYPES[merged[-1][2]],
+                                        merged[-1][0], merged[-1][1],
+                                        _SSE_TYPES[code], start, end, chain))
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end, code])
+            els = np.array(merged, dtype=np.int32).reshape(-1, 3)
+            self._chains[chain] = (els[:, 0], els[:, 1], els[:, 2])
+
+    def _get_codes(self, chain, residues):
+        """Get the SSE type code of each residue, or -1 if not in any SSE"""
+        residues = np.asarray(residues)
+        if chain not in self._chains:
+            return np.full(residues.shape, -1, dtype=np.int32)
+        starts, ends, codes = self._chains[chain]
+        # index of the last element starting at or before each residue
+        ind = np.maximum(np.searchsorted(starts, residues, side='right') - 1,
+                         0)
+        found = (starts[ind] <= residues) & (residues <= ends[ind])
+        return np.where(found, codes[ind], -1)
+
+    def get_sse_type(self, chain, residue):
+        """Get the SSE type ('helix', 'beta' or 'loop') of a residue,
+        or None if it is not in any SSE."""
+        code = self._get_codes(chain, residue)
+        return None if code < 0 else _SSE_TYPES[code]
+
+    def get_residues_in(self, sse_type, chain, residues):
+        """Get a boolean mask of which residues are in an SSE of the
+        given type ('helix', 'beta' or 'loop')."""
+        if sse_type not in _SSE_TYPES:
+            raise ValueError("Unknown SSE type %r; valid types are %s"
+                             % (sse_type, ", ".join(_SSE_TYPES)))
+        return self._get_codes(chain, residues) == _SSE_TYPES.index(sse_type)
 
 def save_best_models(model,
                      out_dir,
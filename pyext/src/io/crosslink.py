@@ -18,11 +18,19 @@ import IMP.display
 import operator
 import math
 import sys
+import re
 import ihm.location
 import ihm.dataset
 from collections import defaultdict
 import numpy
 
+# Site patterns for ResiduePairListParser, compiled once at import time
+# since they are applied to every site of every entry in a dataset
+_MSSTUDIO_XL_RE = re.compile(
+        r'^([ACDEFGHIKLMNOPQRSTYXW])(\d+)-([ACDEFGHIKLMNOPQRSTYXW])(\d+)$')
+_MSSTUDIO_DEAD_END_RE = re.compile(r'^([ACDEFGHIKLMNOPQRSTYXW])(\d+)-$')
+_NON_DIGIT_RE = re.compile("[^0-9]")
+
 # json default serializations
 def set_json_default(obj):
     if isinstance(obj, set):
@@ -403,8 +411,6 @@ class ResiduePairListParser(_CrossLinkDataBaseStandardKeys):
     LAN_HUANG: PROT1:C88-PROT2:C448 ambiguous separators | or ;
     '''
 
-    import re
-
     def __init__(self,style):
 
         _CrossLinkDataBaseStandardKeys.__init__(self)
@@ -437,16 +443,18 @@ class ResiduePairListParser(_CrossLinkDataBaseStandardKeys):
             input_string_pairs=input_string.split(";")
             residue_pair_indexes=[]
             chain_pair_indexes=[]
+            xl_match=_MSSTUDIO_XL_RE.match
             for s in input_string_pairs:
-                m1=self.re.search(r'^(A|C|D|E|F|G|H|I|K|L|M|N|O|P|Q|R|S|T|Y|X|W)(\d+)-(A|C|D|E|F|G|H|I|K|L|M|N|O|P|Q|R|S|T|Y|X|W)(\d+)$',s)
-                m2=self.re.search(r'^(A|C|D|E|F|G|H|I|K|L|M|N|O|P|Q|R|S|T|Y|X|W)(\d+)-$',s)
+                m1=xl_match(s)
                 if m1:
                     # cross-link
                     residue_type_1,residue_index_1,residue_type_2,residue_index_2=m1.group(1,2,3,4)
                     residue_pair_indexes.append((residue_index_1,residue_index_2))
-                elif m2:
-                    # dead end
-                    residue_type_1,residue_index_1=m2.group(1,2)
+                else:
+                    m2=_MSSTUDIO_DEAD_END_RE.match(s)
+                    if m2:
+                        # dead end
+                        residue_type_1,residue_index_1=m2.group(1,2)
             # at this stage chain_pair_indexes is empty
             return  residue_pair_indexes,chain_pair_indexes
         if self.style == "XTRACT" or self.style == "QUANTITATION":
@@ -489,10 +497,11 @@ class ResiduePairListParser(_CrossLinkDataBaseStandardKeys):
             second_residues=second_series.replace(";","|").split("|")
             residue_pair_indexes=[]
             chain_pair_indexes=[]
+            non_digit_sub=_NON_DIGIT_RE.sub
             for fpi in first_residues:
+                residue1=non_digit_sub("", fpi)
                 for spi in second_residues:
-                    residue1=self.re.sub("[^0-9]", "", fpi)
-                    residue2=self.re.sub("[^0-9]", "", spi)
+                    residue2=non_digit_sub("", spi)
                     residue_pair_indexes.append((residue1,residue2))
                     chain_pair_indexes.append((chain1,chain2))
             return residue_pair_indexes, chain_pair_indexes
@@ -617,7 +626,9 @@ class CrossLinkDataBase(_CrossLinkDataBaseStandardKeys):
         @param FixedFormatParser a parser for a fixed format
         '''
         if not FixedFormatParser:
-            xl_list=IMP.pmi.tools.get_db_from_csv(file_name)
+            # stream the rows, so that the raw and converted
+            # cross-links are not both held in memory
+            xl_list=IMP.pmi.tools.iter_db_from_csv(file_name)
 
             if converter is not None:
                 self.cldbkc = converter
@@ -629,13 +640,9 @@ class CrossLinkDataBase(_CrossLinkDataBaseStandardKeys):
                 # normal procedure without a list_parser
                 # each line is a cross-link
                 new_xl_dict={}
+                conversions={}
                 for nxl,xl in enumerate(xl_list):
-                    new_xl={}
-                    for k in xl:
-                        if k in self.converter:
-                            new_xl[self.converter[k]]=self.type[self.converter[k]](xl[k])
-                        else:
-                            new_xl[k]=xl[k]
+                    new_xl=self._convert_entry(xl,conversions)
                     if self.unique_id_key in self.cldbkc.get_setup_keys():
                         if new_xl[self.unique_id_key] not in new_xl_dict:
                             new_xl_dict[new_xl[self.unique_id_key]]=[new_xl]
@@ -649,18 +656,16 @@ class CrossLinkDataBase(_CrossLinkDataBaseStandardKeys):
 
             else:
                 # with a list_parser, a line can be a list of ambiguous cross-links
+                # check the setup before the rows are streamed, so the file
+                # is never left open by the check failing mid-iteration
+                if self.site_pairs_key not in self.cldbkc.get_setup_keys():
+                    raise Error("CrossLinkDataBase: expecting a site_pairs_key for the site pair list parser")
                 new_xl_dict={}
+                conversions={}
                 for nxl,entry in enumerate(xl_list):
 
                     # first get the translated keywords
-                    new_dict={}
-                    if self.site_pairs_key not in self.cldbkc.get_setup_keys():
-                        raise Error("CrossLinkDataBase: expecting a site_pairs_key for the site pair list parser")
-                    for k in entry:
-                        if k in self.converter:
-                            new_dict[self.converter[k]]=self.type[self.converter[k]](entry[k])
-                        else:
-                            new_dict[k]=entry[k]
+                    new_dict=self._convert_entry(entry,conversions)
 
                     residue_pair_list,chain_pair_list=self.list_parser.get_list(new_dict[self.site_pairs_key])
 
@@ -707,14 +712,14 @@ class CrossLinkDataBase(_CrossLinkDataBaseStandardKeys):
             '''
 
             new_xl_dict={}
-            f=open(file_name,"r")
             nxl=0
-            for line in f:
-                xl=FixedFormatParser.get_data(line)
-                if xl:
-                    xl[self.unique_id_key]=str(nxl+1)
-                    new_xl_dict[str(nxl)]=[xl]
-                    nxl+=1
+            with open(file_name,"r") as f:
+                for line in f:
+                    xl=FixedFormatParser.get_data(line)
+                    if xl:
+                        xl[self.unique_id_key]=str(nxl+1)
+                        new_xl_dict[str(nxl)]=[xl]
+                        nxl+=1
 
 
         self.data_base=new_xl_dict
@@ -723,6 +728,28 @@ class CrossLinkDataBase(_CrossLinkDataBaseStandardKeys):
         self.dataset = ihm.dataset.CXMSDataset(l)
         self._update()
 
+    def _convert_entry(self,entry,conversions):
+        '''
+        Translate the keywords of a parsed input row to the standard keys,
+        converting the values to the standard types.
+        The standard key and type of each input keyword are resolved only once
+        and cached in the conversions dictionary, which should be shared by
+        all rows of the same file.
+        '''
+        new_entry={}
+        for k,v in entry.items():
+            try:
+                new_k,conv=conversions[k]
+            except KeyError:
+                if k in self.converter:
+                    new_k=self.converter[k]
+                    conv=self.type[new_k]
+                else:
+                    new_k,conv=k,None
+                conversions[k]=(new_k,conv)
+            new_entry[new_k]=v if conv is None else conv(v)
+        return new_entry
+
     def update_cross_link_unique_sub_index(self):
         for k in self.data_base:
             for n,xl in enumerate(self.data_base[k]):
@@ -731,37 +758,45 @@ class CrossLinkDataBase(_CrossLinkDataBaseStandardKeys):
                 xl[self.unique_sub_id_key]=k+"."+str(n+1)
 
     def update_cross_link_redundancy(self):
+        # key on the unordered pair of (protein,residue) sites, so that a
+        # cross-link and its inverse share one entry
         redundancy_data_base={}
-        for xl in self:
-            pra=_ProteinsResiduesArray(xl)
-            if pra not in redundancy_data_base:
-                redundancy_data_base[pra]=[xl[self.unique_sub_id_key]]
-                redundancy_data_base[pra.get_inverted()]=[xl[self.unique_sub_id_key]]
-            else:
-                redundancy_data_base[pra].append(xl[self.unique_sub_id_key])
-                redundancy_data_base[pra.get_inverted()].append(xl[self.unique_sub_id_key])
-        for xl in self:
-            pra=_ProteinsResiduesArray(xl)
-            xl[self.redundancy_key]=len(redundancy_data_base[pra])
-            xl[self.redundancy_list_key]=redundancy_data_base[pra]
-
-    def update_residues_links_number(self):
-        residue_links={}
+        xl_keys=[]
         for xl in self:
             (p1,p2,r1,r2)=_ProteinsResiduesArray(xl)
-            if (p1,r1) not in residue_links:
-                residue_links[(p1,r1)]=set([(p2,r2)])
+            key=frozenset(((p1,r1),(p2,r2)))
+            xl_keys.append((xl,key))
+            if key not in redundancy_data_base:
+                redundancy_data_base[key]=[xl[self.unique_sub_id_key]]
             else:
-                residue_links[(p1,r1)].add((p2,r2))
-            if (p2,r2) not in residue_links:
-                residue_links[(p2,r2)]=set([(p1,r1)])
-            else:
-                residue_links[(p2,r2)].add((p1,r1))
+                redundancy_data_base[key].append(xl[self.unique_sub_id_key])
+        for xl,key in xl_keys:
+            xl[self.redundancy_key]=len(redundancy_data_base[key])
+            xl[self.redundancy_list_key]=redundancy_data_base[key]
 
+    def update_residues_links_number(self):
+        # number each (protein,residue) site, then count the distinct
+        # partners of each site from the unique pairs of site numbers
+        site_ids={}
+        xl_sites=[]
         for xl in self:
             (p1,p2,r1,r2)=_ProteinsResiduesArray(xl)
-            xl[self.residue1_links_number_key]=len(residue_links[(p1,r1)])
-            xl[self.residue2_links_number_key]=len(residue_links[(p2,r2)])
+            s1=site_ids.setdefault((p1,r1),len(site_ids))
+            s2=site_ids.setdefault((p2,r2),len(site_ids))
+            xl_sites.append((xl,s1,s2))
+        if not xl_sites:
+            return
+
+        nsites=len(site_ids)
+        sites=numpy.array([(s1,s2) for xl,s1,s2 in xl_sites],dtype=numpy.int64)
+        links=numpy.concatenate((sites,sites[:,::-1]))
+        unique_links=numpy.unique(links[:,0]*nsites+links[:,1])
+        links_number=numpy.bincount(unique_links//nsites,
+                                    minlength=nsites).tolist()
+
+        for xl,s1,s2 in xl_sites:
+            xl[self.residue1_links_number_key]=links_number[s1]
+            xl[self.residue2_links_number_key]=links_number[s2]
 
     def check_cross_link_consistency(self):
         """This function checks the consistency of the dataset with the amino acid sequence"""
@@ -1132,18 +1132,19 @@ class CysteineCrossLinkRestraint(object):
             t = line.split()
             if t[0][0] == "#":
                 continue
+            fexp = float(t[4])
             if t[5] in self.epsilons:
-                if 1.0 - float(t[4]) <= self.epsilons[t[5]].get_upper():
-                    self.epsilons[t[5]].set_upper(1.0 - float(t[4]))
+                if 1.0 - fexp <= self.epsilons[t[5]].get_upper():
+                    self.epsilons[t[5]].set_upper(1.0 - fexp)
             else:
                 self.epsilons[t[5]] = IMP.pmi.tools.SetupNuisance(self.m,
-                                                                  0.01, 0.01, 1.0 - float(t[4]), epsilonissampled).get_particle()
+                                                                  0.01, 0.01, 1.0 - fexp, epsilonissampled).get_particle()
             up = self.epsilons[t[5]].get_upper()
             low = self.epsilons[t[5]].get_lower()
             if up < low:
                 self.epsilons[t[5]].set_upper(low)
 
-            data.append((int(t[0]), t[1], int(t[2]), t[3], float(t[4]), t[5]))
+            data.append((int(t[0]), t[1], int(t[2]), t[3], fexp, t[5]))
 
         # create CrossLinkData
         if not self.cbeta:
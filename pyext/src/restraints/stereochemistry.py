@@ -233,11 +233,16 @@ class ExcludedVolumeSphere(object):
         self.rs.add_restraint(evr)
 
     def add_excluded_particle_pairs(self, excluded_particle_pairs):
-        # add pairs to be filtered when calculating the score
-        inverted=[(p1,p0)for p0,p1 in  excluded_particle_pairs]
+        # add pairs to be filtered when calculating the score, in both
+        # orientations. Callers usually pass both orientations already
+        # (e.g. from get_excluded_pairs()), so collect the distinct
+        # index pairs first and fill the container in a single call
+        pairs = set()
+        for p0, p1 in IMP.get_indexes(excluded_particle_pairs):
+            pairs.add((p0, p1))
+            pairs.add((p1, p0))
         lpc = IMP.container.ListPairContainer(self.mdl)
-        lpc.add(IMP.get_indexes(excluded_particle_pairs))
-        lpc.add(IMP.get_indexes(inverted))
+        lpc.add(list(pairs))
         icpf = IMP.container.InContainerPairFilter(lpc)
         self.cpc.add_pair_filter(icpf)
 
@@ -343,6 +348,11 @@ class ResidueBondRestraint(object):
         """
 
         particles = IMP.pmi.tools.input_adaptor(objects,1,flatten=True)
+        self._setup(particles, distance, strength, jitter)
+
+    def _setup(self, particles, distance, strength, jitter):
+        """Set up the restraint on residues already selected at
+           resolution 1"""
         self.m = particles[0].get_model()
 
         self.rs = IMP.RestraintSet(self.m, "Bonds")
@@ -358,6 +368,9 @@ class ResidueBondRestraint(object):
             ts = IMP.core.HarmonicWell(
                 (distance - jitter, distance + jitter), strength)
 
+        # all bonds are scored by a single restraint over a pair container,
+        # rather than one DistanceRestraint per bond
+        bonds = []
         for ps in IMP.pmi.tools.sublist_iterator(particles, 2, 2):
             pair = []
             if len(ps) != 2:
@@ -368,10 +381,13 @@ class ResidueBondRestraint(object):
                 else:
                     pair.append(p)
             print("ResidueBondRestraint: adding a restraint between %s %s" % (pair[0].get_name(), pair[1].get_name()))
-            self.rs.add_restraint(
-                IMP.core.DistanceRestraint(self.m, ts, pair[0], pair[1]))
+            bonds.append((pair[0].get_index(), pair[1].get_index()))
             self.pairslist.append(IMP.ParticlePair(pair[0], pair[1]))
             self.pairslist.append(IMP.ParticlePair(pair[1], pair[0]))
+        lpc = IMP.container.ListPairContainer(self.m)
+        lpc.add(bonds)
+        self.rs.add_restraint(
+            IMP.container.PairsRestraint(IMP.core.DistancePairScore(ts), lpc))
 
     def set_label(self, label):
         self.label = label
@@ -407,6 +423,11 @@ class ResidueAngleRestraint(object):
     def __init__(self, objects, anglemin=100.0, anglemax=140.0, strength=10.0):
 
         particles = IMP.pmi.tools.input_adaptor(objects,1,flatten=True)
+        self._setup(particles, anglemin, anglemax, strength)
+
+    def _setup(self, particles, anglemin, anglemax, strength):
+        """Set up the restraint on residues already selected at
+           resolution 1"""
         self.m = particles[0].get_model()
 
         self.rs = IMP.RestraintSet(self.m, "Angles")
@@ -419,6 +440,9 @@ class ResidueAngleRestraint(object):
              pi * anglemax / 180.0),
             strength)
 
+        # all angles are scored by a single restraint over a triplet
+        # container, rather than one AngleRestraint per angle
+        angles = []
         for ps in IMP.pmi.tools.sublist_iterator(particles, 3, 3):
             triplet = []
             if len(ps) != 3:
@@ -429,13 +453,15 @@ class ResidueAngleRestraint(object):
                 else:
                     triplet.append(p)
             print("ResidueAngleRestraint: adding a restraint between %s %s %s" % (triplet[0].get_name(), triplet[1].get_name(), triplet[2].get_name()))
-            self.rs.add_restraint(
-                IMP.core.AngleRestraint(triplet[0].get_model(), ts,
-                                        triplet[0],
-                                        triplet[1],
-                                        triplet[2]))
+            angles.append((triplet[0].get_index(), triplet[1].get_index(),
+                           triplet[2].get_index()))
             self.pairslist.append(IMP.ParticlePair(triplet[0], triplet[2]))
             self.pairslist.append(IMP.ParticlePair(triplet[2], triplet[0]))
+        ltc = IMP.container.ListTripletContainer(self.m)
+        ltc.add(angles)
+        self.rs.add_restraint(
+            IMP.container.TripletsRestraint(IMP.core.AngleTripletScore(ts),
+                                            ltc))
 
     def set_label(self, label):
         self.label = label
@@ -464,6 +490,25 @@ class ResidueAngleRestraint(object):
         return output
 
 
+def get_residue_bond_and_angle_restraints(objects, distance=3.78,
+                                          jitter=None, anglemin=100.0,
+                                          anglemax=140.0, bond_strength=10.0,
+                                          angle_strength=10.0):
+    """Create a ResidueBondRestraint and a ResidueAngleRestraint on the
+    same objects. The residues are selected only once and shared between
+    the two restraints, rather than once by each constructor.
+    See ResidueBondRestraint and ResidueAngleRestraint for the parameters.
+    @return A tuple of the bond restraint, the angle restraint, and the
+            list of particle pairs excluded by both
+    """
+    particles = IMP.pmi.tools.input_adaptor(objects, 1, flatten=True)
+    rbr = ResidueBondRestraint.__new__(ResidueBondRestraint)
+    rbr._setup(particles, distance, bond_strength, jitter)
+    rar = ResidueAngleRestraint.__new__(ResidueAngleRestraint)
+    rar._setup(particles, anglemin, anglemax, angle_strength)
+    return rbr, rar, rbr.get_excluded_pairs() + rar.get_excluded_pairs()
+
+
 class ResidueDihedralRestraint(object):
     """Add dihedral restraints between quadruplet of consecutive
     residues/beads to enforce the stereochemistry.
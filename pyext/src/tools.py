@@ -130,16 +130,23 @@ class Stopwatch(object):
     def set_label(self, labelstr):
         self.label = labelstr
 
+    def get_seconds(self):
+        """Get the time in seconds as a number, without building an
+           output dictionary. As for get_output(), if isdelta is True this
+           is the time since the last call, and resets the timer."""
+        newtime = process_time()
+        seconds = newtime - self.starttime
+        if self.isdelta:
+            self.starttime = newtime
+        return seconds
+
     def get_output(self):
         output = {}
         if self.isdelta:
-            newtime = process_time()
-            output["Stopwatch_" + self.label + "_delta_seconds"] \
-                    = str(newtime - self.starttime)
-            self.starttime = newtime
+            suffix = "_delta_seconds"
         else:
-            output["Stopwatch_" + self.label + "_elapsed_seconds"] \
-                    = str(process_time() - self.starttime)
+            suffix = "_elapsed_seconds"
+        output["Stopwatch_" + self.label + suffix] = str(self.get_seconds())
         return output
 
 
@@ -362,13 +369,25 @@ def open_file_or_inline_text(filename):
         fl = filename.split("\n")
     return fl
 
+_fasta_ids_cache = {}
+
 def get_ids_from_fasta_file(fastafile):
-    ids = []
-    with open(fastafile) as ff:
-        for l in ff:
-            if l[0] == ">":
-                ids.append(l[1:-1])
-    return ids
+    """Get the list of sequence IDs in a FASTA file.
+       Results are cached, keyed on the file's path, modification time
+       and size, so repeated calls for an unchanged file do not read it
+       again."""
+    st = os.stat(fastafile)
+    # st_mtime_ns is only available in Python 3
+    key = (os.path.abspath(fastafile),
+           getattr(st, 'st_mtime_ns', st.st_mtime), st.st_size)
+    if key not in _fasta_ids_cache:
+        ids = []
+        with open(fastafile) as ff:
+            for l in ff:
+                if l[0] == ">":
+                    ids.append(l[1:-1])
+        _fasta_ids_cache[key] = ids
+    return list(_fasta_ids_cache[key])
 
 
 def get_closest_residue_position(hier, resindex, terminus="N"):
@@ -414,40 +433,23 @@ def get_residue_gaps_in_hierarchy(hierarchy, start, end):
     @return A list of lists of the form
             [[1,100,"cont"],[101,120,"gap"],[121,200,"cont"]]
     '''
-    gaps = []
-    for n, rindex in enumerate(range(start, end + 1)):
-        sel = IMP.atom.Selection(hierarchy, residue_index=rindex,
-                                 atom_type=IMP.atom.AT_CA)
+    # select the CA atoms (or coarse-grained beads) of the whole range
+    # at once, rather than running one selection per residue
+    sel = IMP.atom.Selection(hierarchy,
+                             residue_indexes=list(range(start, end + 1)),
+                             atom_type=IMP.atom.AT_CA)
+    present = set()
+    for p in sel.get_selected_particles():
+        present.update(get_residue_indexes(p))
 
-        if len(sel.get_selected_particles()) == 0:
-            if n == 0:
-                # set the initial condition
-                rindexgap = start
-                rindexcont = start - 1
-            if rindexgap == rindex - 1:
-                # residue is contiguous with the previously discovered gap
-                gaps[-1][1] += 1
-            else:
-                # residue is not contiguous with the previously discovered gap
-                # hence create a new gap tuple
-                gaps.append([rindex, rindex, "gap"])
-            # update the index of the last residue gap
-            rindexgap = rindex
+    gaps = []
+    for rindex in range(start, end + 1):
+        segtype = "cont" if rindex in present else "gap"
+        if gaps and gaps[-1][2] == segtype:
+            # residue is contiguous with the previous segment of this type
+            gaps[-1][1] = rindex
         else:
-            if n == 0:
-                # set the initial condition
-                rindexgap = start - 1
-                rindexcont = start
-            if rindexcont == rindex - 1:
-                # residue is contiguous with the previously discovered
-                # continuous part
-                gaps[-1][1] += 1
-            else:
-                # residue is not contiguous with the previously discovered continuous part
-                # hence create a new cont tuple
-                gaps.append([rindex, rindex, "cont"])
-            # update the index of the last residue gap
-            rindexcont = rindex
+            gaps.append([rindex, rindex, segtype])
     return gaps
 
 
@@ -520,14 +522,18 @@ def select_by_tuple_2(hier,tuple_selection,resolution):
 
 
 
-def get_db_from_csv(csvfilename):
+def iter_db_from_csv(csvfilename):
+    """Iterate over the rows of a CSV file, yielding each as a dictionary
+       keyed by the column headers. Unlike get_db_from_csv(), only one row
+       is held in memory at a time."""
     import csv
-    outputlist = []
     with open(csvfilename) as fh:
-        csvr = csv.DictReader(fh)
-        for l in csvr:
-            outputlist.append(l)
-    return outputlist
+        for l in csv.DictReader(fh):
+            yield l
+
+
+def get_db_from_csv(csvfilename):
+    return list(iter_db_from_csv(csvfilename))
 
 
 def get_prot_name_from_particle(p, list_of_names):
@@ -1338,6 +1344,9 @@ def shuffle_configuration(objects,
                 other_idxs = all_idxs - rb_idxs
                 if not other_idxs:
                     continue
+                # convert once, not on every collision check
+                rb_idx_list = list(rb_idxs)
+                other_idx_list = list(other_idxs)
 
             # iterate, trying to avoid collisions
             niter = 0
@@ -1369,8 +1378,8 @@ def shuffle_configuration(objects,
                 if avoidcollision_rb:
                     mdl.update()
                     npairs = len(gcpf.get_close_pairs(mdl,
-                                                      list(other_idxs),
-                                                      list(rb_idxs)))
+                                                      other_idx_list,
+                                                      rb_idx_list))
                     #print("NPAIRS:", npairs)
                     if npairs==0:
                         break
@@ -1392,6 +1401,9 @@ def shuffle_configuration(objects,
             other_idxs = all_idxs - fb_idxs
             if not other_idxs:
                 continue
+            # convert once, not on every collision check
+            fb_idx_list = list(fb_idxs)
+            other_idx_list = list(other_idxs)
 
         # iterate, trying to avoid collisions
         niter = 0
@@ -1436,8 +1448,8 @@ def shuffle_configuration(objects,
             if avoidcollision_fb:
                 mdl.update()
                 npairs = len(gcpf.get_close_pairs(mdl,
-                                                  list(other_idxs),
-                                                  list(fb_idxs)))
+                                                  other_idx_list,
+                                                  fb_idx_list))
 
                 if npairs==0:
                     break
@@ -1,3 +1,4 @@
+from __future__ import print_function
 import IMP
 import IMP.pmi
 import IMP.pmi.macros
@@ -29,6 +29,33 @@ class Tests(IMP.test.TestCase):
         self.assertEqual(len(sses['beta']),18)
         self.assertEqual(len(sses['loop']),183)
 
+    def test_sse_lookup(self):
+        """Test SSELookup"""
+        sses = IMP.pmi.io.parse_dssp(self.get_input_file_name('chainA.dssp'),
+                                     'A')
+        lookup = IMP.pmi.io.SSELookup(sses)
+        self.assertEqual(lookup.get_sse_type('A', 110), 'helix')
+        self.assertEqual(lookup.get_sse_type('A', 77), 'beta')
+        self.assertIsNone(lookup.get_sse_type('A', -5))
+        self.assertIsNone(lookup.get_sse_type('B', 110))
+        self.assertEqual(list(lookup.get_residues_in('helix', 'A',
+                                                     [99, 100, 126, 127])),
+                         [False, True, True, False])
+        self.assertRaises(ValueError, lookup.get_residues_in, 'coil', 'A',
+                          [110])
+
+    def test_sse_lookup_overlap(self):
+        """Test SSELookup with overlapping elements for one name"""
+        # e.g. two chains mapped to the same molecule name
+        sses = {'helix': [[[1, 10, 'X']], [[5, 12, 'X']]],
+                'beta': [], 'loop': []}
+        lookup = IMP.pmi.io.SSELookup(sses)
+        self.assertEqual(lookup.get_sse_type('X', 8), 'helix')
+        self.assertEqual(lookup.get_sse_type('X', 11), 'helix')
+        self.assertIsNone(lookup.get_sse_type('X', 13))
+        sses['loop'].append([[5, 6, 'X']])
+        self.assertRaises(ValueError, IMP.pmi.io.SSELookup, sses)
+
     def test_save_best_models(self):
         """Test save_best_models()"""
         m = IMP.Model()
@@ -451,8 +451,42 @@ class Tests(IMP.test.TestCase):
 
 
     def test_redundancy(self):
+        """Test redundancy of inverted and repeated cross-links"""
         cldb=self.setup_cldb("xl_dataset_test.dat")
-        pass
+        for xl in cldb["4"]+cldb["8"]+cldb["9"]:
+            self.assertEqual(xl[cldb.redundancy_key],3)
+            self.assertEqual(xl[cldb.redundancy_list_key],
+                             ['4.1','8.1','9.1'])
+        for xl in cldb["1"][:1]+cldb["10"]:
+            self.assertEqual(xl[cldb.redundancy_key],2)
+            self.assertEqual(xl[cldb.redundancy_list_key],['1.1','10.1'])
+        for xl in cldb["7"]:
+            self.assertEqual(xl[cldb.redundancy_key],1)
+
+    def test_redundancy_self_link(self):
+        """Test redundancy of cross-links between a site and itself"""
+        fname=self.get_tmp_file_name("self_links.dat")
+        with open(fname,"w") as fh:
+            fh.write("prot1,prot2,res1,res2,id,sample,score\n"
+                     "AAA,AAA,5,5,1,yeast,10\n"
+                     "AAA,AAA,5,5,2,yeast,9\n"
+                     "BBB,BBB,7,7,3,yeast,8\n")
+        cldbkc=IMP.pmi.io.crosslink.CrossLinkDataBaseKeywordsConverter()
+        cldbkc.set_protein1_key("prot1")
+        cldbkc.set_protein2_key("prot2")
+        cldbkc.set_residue1_key("res1")
+        cldbkc.set_residue2_key("res2")
+        cldbkc.set_unique_id_key("id")
+        cldbkc.set_id_score_key("score")
+        cldb=IMP.pmi.io.crosslink.CrossLinkDataBase(cldbkc)
+        cldb.create_set_from_file(fname)
+        # each self-link is counted once, not once per end
+        for xl in cldb["1"]+cldb["2"]:
+            self.assertEqual(xl[cldb.redundancy_key],2)
+            self.assertEqual(xl[cldb.redundancy_list_key],['1.1','2.1'])
+        for xl in cldb["3"]:
+            self.assertEqual(xl[cldb.redundancy_key],1)
+            self.assertEqual(xl[cldb.redundancy_list_key],['3.1'])
 
     def test_merge_cldbkc(self):
         """Test CrossLinkDatabase.merge()"""
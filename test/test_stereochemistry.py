@@ -1,9 +1,12 @@
 from __future__ import print_function
+import math
 import IMP
+import IMP.core
 import IMP.test
 
 import IMP.pmi.restraints.stereochemistry
 import IMP.pmi.topology
+import IMP.pmi.tools
 
 class Tests(IMP.test.TestCase):
     def make_topology(self):
@@ -53,6 +56,60 @@ class Tests(IMP.test.TestCase):
         rd.add_to_model()
         print(rd.get_output())
 
+    def test_residue_restraint_scores(self):
+        """Test Residue(Bond|Angle)Restraint scores match per-item sums"""
+        m, root_hier, hier_dict = self.make_topology()
+        objects = hier_dict["Rpb3"][29:40]
+        ps = IMP.pmi.tools.input_adaptor(objects, 1, flatten=True)
+
+        rb = IMP.pmi.restraints.stereochemistry.ResidueBondRestraint(
+            objects=objects)
+        ts = IMP.core.Harmonic(3.78, 10.0)
+        expected = sum(
+            IMP.core.DistanceRestraint(m, ts, p0, p1).unprotected_evaluate(
+                None) for p0, p1 in zip(ps, ps[1:]))
+        self.assertAlmostEqual(rb.get_restraint().unprotected_evaluate(None),
+                               expected, delta=1e-6)
+        self.assertAlmostEqual(
+            float(rb.get_output()["ResidueBondRestraint_None"]),
+            expected, delta=1e-4)
+        self.assertEqual(len(rb.get_excluded_pairs()), 2 * (len(ps) - 1))
+
+        ra = IMP.pmi.restraints.stereochemistry.ResidueAngleRestraint(
+            objects=objects)
+        ts = IMP.core.HarmonicWell((math.pi * 100.0 / 180.0,
+                                    math.pi * 140.0 / 180.0), 10.0)
+        expected = sum(
+            IMP.core.AngleRestraint(m, ts, p0, p1, p2).unprotected_evaluate(
+                None) for p0, p1, p2 in zip(ps, ps[1:], ps[2:]))
+        self.assertAlmostEqual(ra.get_restraint().unprotected_evaluate(None),
+                               expected, delta=1e-6)
+        self.assertAlmostEqual(
+            float(ra.get_output()["ResidueAngleRestraint_None"]),
+            expected, delta=1e-4)
+        self.assertEqual(len(ra.get_excluded_pairs()), 2 * (len(ps) - 2))
+
+    def test_residue_bond_and_angle_restraints(self):
+        """Test get_residue_bond_and_angle_restraints()"""
+        m, root_hier, hier_dict = self.make_topology()
+        objects = hier_dict["Rpb3"][29:40]
+        rb = IMP.pmi.restraints.stereochemistry.ResidueBondRestraint(
+            objects=objects)
+        ra = IMP.pmi.restraints.stereochemistry.ResidueAngleRestraint(
+            objects=objects)
+        frb, fra, excluded = IMP.pmi.restraints.stereochemistry.\
+            get_residue_bond_and_angle_restraints(objects=objects)
+        self.assertAlmostEqual(frb.get_restraint().unprotected_evaluate(None),
+                               rb.get_restraint().unprotected_evaluate(None),
+                               delta=1e-6)
+        self.assertAlmostEqual(fra.get_restraint().unprotected_evaluate(None),
+                               ra.get_restraint().unprotected_evaluate(None),
+                               delta=1e-6)
+        self.assertEqual(list(frb.get_output().keys()),
+                         list(rb.get_output().keys()))
+        self.assertEqual(len(excluded), len(rb.get_excluded_pairs())
+                                        + len(ra.get_excluded_pairs()))
+
 
 if __name__ == '__main__':
     IMP.test.main()
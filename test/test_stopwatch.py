@@ -13,15 +13,18 @@ def mocked_object(parent, objname, replacement):
     yield
     setattr(parent, objname, oldobj)
 
+class MockClock(object):
+    """Replacement for process_time() that returns whole seconds,
+       advancing by one on each call"""
+    count = 0
+    def __call__(self):
+        self.count += 1
+        return self.count
+
 def get_times(outkey, *args, **kwargs):
     """Get a sequence of times by calling Stopwatch repeatedly. Ensure that
        times are reliable by overriding time.clock() to always return whole
        seconds."""
-    class MockClock(object):
-        count = 0
-        def __call__(self):
-            self.count += 1
-            return self.count
     with mocked_object(IMP.pmi.tools, 'process_time', MockClock()):
         s = IMP.pmi.tools.Stopwatch(*args, **kwargs)
         return [s.get_output()[outkey] for _ in range(4)]
@@ -51,5 +54,13 @@ class Tests(IMP.test.TestCase):
         times = get_times('Stopwatch_None_elapsed_seconds', isdelta=False)
         self.assertEqual(times, ['1', '2', '3', '4'])
 
+    def test_stopwatch_seconds(self):
+        """Test Stopwatch.get_seconds()"""
+        with mocked_object(IMP.pmi.tools, 'process_time', MockClock()):
+            s = IMP.pmi.tools.Stopwatch()
+            self.assertEqual([s.get_seconds() for _ in range(3)], [1] * 3)
+            s = IMP.pmi.tools.Stopwatch(isdelta=False)
+            self.assertEqual([s.get_seconds() for _ in range(3)], [1, 2, 3])
+
 if __name__ == '__main__':
     IMP.test.main()
@@ -819,6 +819,68 @@ class Tests(IMP.test.TestCase):
         self.assertEqual(list(out),
                          [['a'], ['a', 'b'], ['b'], ['b', 'c'], ['c']])
 
+    def test_get_residue_gaps_in_hierarchy(self):
+        """Test get_residue_gaps_in_hierarchy()"""
+        m = IMP.Model()
+        root = IMP.atom.Hierarchy.setup_particle(IMP.Particle(m))
+        for i in (1, 2, 5):
+            r = IMP.atom.Residue.setup_particle(IMP.Particle(m),
+                                                IMP.atom.ALA, i)
+            a = IMP.atom.Atom.setup_particle(IMP.Particle(m),
+                                             IMP.atom.AT_CA)
+            IMP.core.XYZR.setup_particle(a, IMP.algebra.Sphere3D(
+                                        IMP.algebra.Vector3D(i, 0, 0), 1.0))
+            r.add_child(a)
+            root.add_child(r)
+        gaps = IMP.pmi.tools.get_residue_gaps_in_hierarchy(root, 1, 7)
+        self.assertEqual(gaps, [[1, 2, "cont"], [3, 4, "gap"],
+                                [5, 5, "cont"], [6, 7, "gap"]])
+        # Coarse-grained beads (a residue with no atoms, and a fragment)
+        # should count as present too
+        r = IMP.atom.Residue.setup_particle(IMP.Particle(m), IMP.atom.ALA, 3)
+        IMP.core.XYZR.setup_particle(r, IMP.algebra.Sphere3D(
+                                    IMP.algebra.Vector3D(3, 0, 0), 1.0))
+        root.add_child(r)
+        f = IMP.atom.Fragment.setup_particle(IMP.Particle(m), [7, 8])
+        IMP.core.XYZR.setup_particle(f, IMP.algebra.Sphere3D(
+                                    IMP.algebra.Vector3D(7, 0, 0), 2.0))
+        root.add_child(f)
+        gaps = IMP.pmi.tools.get_residue_gaps_in_hierarchy(root, 1, 8)
+        self.assertEqual(gaps, [[1, 3, "cont"], [4, 4, "gap"],
+                                [5, 5, "cont"], [6, 6, "gap"],
+                                [7, 8, "cont"]])
+
+    def test_get_ids_from_fasta_file(self):
+        """Test get_ids_from_fasta_file()"""
+        fname = self.get_tmp_file_name('ids.fasta')
+        with open(fname, 'w') as fh:
+            fh.write('>foo\nACGT\n>bar\nCC\n')
+        ids = IMP.pmi.tools.get_ids_from_fasta_file(fname)
+        self.assertEqual(ids, ['foo', 'bar'])
+        # Modifying the returned list should not affect the cache
+        ids.append('baz')
+        self.assertEqual(IMP.pmi.tools.get_ids_from_fasta_file(fname),
+                         ['foo', 'bar'])
+        # A file rewritten with the same size should be read again, even if
+        # its mtime differs only by a nanosecond (where supported)
+        st = os.stat(fname)
+        with open(fname, 'w') as fh:
+            fh.write('>baz\nACGT\n>qux\nGG\n')
+        if hasattr(st, 'st_mtime_ns'):
+            os.utime(fname, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        else:
+            os.utime(fname, (st.st_atime, st.st_mtime + 1))
+        self.assertEqual(IMP.pmi.tools.get_ids_from_fasta_file(fname),
+                         ['baz', 'qux'])
+        # A file rewritten with the same mtime but a different size
+        # should also be read again
+        st = os.stat(fname)
+        with open(fname, 'w') as fh:
+            fh.write('>baz\nACGT\n')
+        os.utime(fname, (st.st_atime, st.st_mtime))
+        self.assertEqual(IMP.pmi.tools.get_ids_from_fasta_file(fname),
+                         ['baz'])
+
     def test_flatten_list(self):
         """Test flatten_list()"""
         inp = [['a', 'b', 'c'], ['d', 'e']]